@@ -4,28 +4,135 @@ Analyze and visualize token distribution from the analytics files.
 """
 
 import json
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Render off-screen; charts are only written to files
 import matplotlib.pyplot as plt
 import seaborn as sns
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional, fall back to the NumPy kernel
+    njit = None
+
+# PNG output settings; zlib deflate dominates savefig time, so trade a
+# slightly larger file for a much faster encode
+SAVEFIG_KWARGS = {'dpi': 150, 'pil_kwargs': {'compress_level': 1}}
+
+# Same ranges and percentiles as the analytics generated by process.ts
+DISTRIBUTION_BUCKETS = [
+    (1, 5, '1-5'),
+    (6, 10, '6-10'),
+    (11, 20, '11-20'),
+    (21, 50, '21-50'),
+    (51, 100, '51-100'),
+    (101, 200, '101-200'),
+    (201, 500, '201-500'),
+    (501, 1000, '501-1000'),
+    (1001, None, '1001+'),
+]
+PERCENTILES = [10, 25, 50, 75, 90, 95, 99]
+
+def _gini_from_sorted_loop(amounts):
+    """Streaming Gini over ascending amounts using sorted prefix sums."""
+    s = 0.0
+    c = 0.0
+    n = amounts.size
+    for i in range(n):
+        c += amounts[i]
+        s += c
+    # All-zero amounts have no defined Gini; match the NumPy kernel's nan
+    # instead of raising ZeroDivisionError under numba's Python semantics
+    if c == 0.0:
+        return np.nan
+    return 1.0 - (2.0 * s - c) / (n * c)
+
+def _gini_from_sorted_numpy(amounts):
+    """NumPy equivalent of the streaming Gini kernel."""
+    cum = np.cumsum(amounts, dtype=np.float64)
+    return 1.0 - (2.0 * cum.sum() - cum[-1]) / (amounts.size * cum[-1])
+
+if njit is not None:
+    gini_from_sorted = njit(cache=True)(_gini_from_sorted_loop)
+else:
+    gini_from_sorted = _gini_from_sorted_numpy
+
 def load_data(analytics_file, csv_file):
-    """Load analytics JSON and CSV data."""
-    with open(analytics_file, 'r') as f:
-        analytics = json.load(f)
-    
-    df = pd.read_csv(csv_file)
+    """Load analytics JSON (if given) and CSV data."""
+    analytics = None
+    if analytics_file:
+        with open(analytics_file, 'r') as f:
+            analytics = json.load(f)
+    
+    # Only address and amount are used; fixed dtypes let the C parser skip inference
+    df = pd.read_csv(
+        csv_file,
+        usecols=['address', 'amount'],
+        dtype={'address': 'string', 'amount': 'int64'},
+        engine='c',
+    )
     return analytics, df
 
-def create_distribution_histogram(df, output_dir):
+def compute_analytics(df, amounts_sorted, cum):
+    """Compute the process.ts analytics from the sorted amounts and their prefix sums."""
+    n = amounts_sorted.size
+    total = cum[-1]
+    mean = total / n
+    
+    # Median averages the two middle values (the same value for odd n)
+    median = (int(amounts_sorted[(n - 1) // 2]) + int(amounts_sorted[n // 2])) / 2
+    
+    # Percentiles are direct reads from the sorted array
+    idx = (np.array(PERCENTILES) / 100.0 * (n - 1)).astype(int)
+    percentiles = {f'p{p}': int(v) for p, v in zip(PERCENTILES, amounts_sorted[idx])}
+    
+    # Bucket counts and token totals from binary searches over the prefix sums
+    buckets = []
+    for low, high, label in DISTRIBUTION_BUCKETS:
+        lo = np.searchsorted(amounts_sorted, low, side='left')
+        hi = n if high is None else np.searchsorted(amounts_sorted, high, side='right')
+        if hi > lo:
+            bucket_tokens = cum[hi - 1] - (cum[lo - 1] if lo > 0 else 0.0)
+            buckets.append({
+                'range': label,
+                'count': int(hi - lo),
+                'totalTokens': int(round(bucket_tokens)),
+            })
+    
+    # Top holders need addresses, so select them from the frame; the stable
+    # sort keeps tied amounts in file (rank) order, matching process.ts
+    amounts = df['amount'].to_numpy()
+    top_idx = np.argsort(-amounts, kind='stable')[:20]
+    top_holders = [
+        {'address': str(address), 'amount': int(amount)}
+        for address, amount in zip(df['address'].to_numpy()[top_idx], amounts[top_idx])
+    ]
+    
+    return {
+        'totalHolders': int(n),
+        'totalTokensDistributed': int(round(total)),
+        'averageTokensPerHolder': float(mean),
+        'medianTokensPerHolder': int(median) if median.is_integer() else median,
+        'standardDeviation': float(np.std(amounts_sorted)),
+        'min': int(amounts_sorted[0]),
+        'max': int(amounts_sorted[-1]),
+        'distributionBuckets': buckets,
+        'topHolders': top_holders,
+        'percentiles': percentiles,
+    }
+
+def create_distribution_histogram(amounts_sorted, output_dir):
     """Create histogram of token distribution."""
     plt.figure(figsize=(10, 6))
     
-    # Create bins for better visualization
-    bins = [0, 5, 10, 20, 50, 100, 200, 500, 1000, df['amount'].max() + 1]
+    # Create bins for better visualization; the max is the last sorted amount
+    bins = [0, 5, 10, 20, 50, 100, 200, 500, 1000, amounts_sorted[-1] + 1]
     
-    plt.hist(df['amount'], bins=bins, edgecolor='black', alpha=0.7)
+    plt.hist(amounts_sorted, bins=bins, edgecolor='black', alpha=0.7)
     plt.xlabel('Token Amount')
     plt.ylabel('Number of Addresses')
     plt.title('Token Distribution Histogram')
@@ -33,21 +140,18 @@ def create_distribution_histogram(df, output_dir):
     plt.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig(output_dir / 'distribution_histogram.png', dpi=300)
+    plt.savefig(output_dir / 'distribution_histogram.png', **SAVEFIG_KWARGS)
     plt.close()
 
-def create_cumulative_distribution(df, output_dir):
+def create_cumulative_distribution(amounts_sorted, cum, output_dir):
     """Create cumulative distribution chart."""
     plt.figure(figsize=(10, 6))
     
-    # Sort by amount and calculate cumulative
-    sorted_df = df.sort_values('amount')
-    sorted_df['cumulative_holders'] = range(1, len(sorted_df) + 1)
-    sorted_df['cumulative_tokens'] = sorted_df['amount'].cumsum()
+    cumulative_holders = np.arange(1, amounts_sorted.size + 1)
     
     # Plot cumulative holders
     plt.subplot(2, 1, 1)
-    plt.plot(sorted_df['amount'], sorted_df['cumulative_holders'])
+    plt.plot(amounts_sorted, cumulative_holders)
     plt.xlabel('Token Amount')
     plt.ylabel('Cumulative Holders')
     plt.title('Cumulative Distribution of Holders')
@@ -55,14 +159,14 @@ def create_cumulative_distribution(df, output_dir):
     
     # Plot cumulative tokens
     plt.subplot(2, 1, 2)
-    plt.plot(sorted_df['amount'], sorted_df['cumulative_tokens'])
+    plt.plot(amounts_sorted, cum)
     plt.xlabel('Token Amount')
     plt.ylabel('Cumulative Tokens')
     plt.title('Cumulative Distribution of Tokens')
     plt.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig(output_dir / 'cumulative_distribution.png', dpi=300)
+    plt.savefig(output_dir / 'cumulative_distribution.png', **SAVEFIG_KWARGS)
     plt.close()
 
 def create_bucket_chart(analytics, output_dir):
@@ -107,20 +211,18 @@ def create_bucket_chart(analytics, output_dir):
                 ha='center', va='bottom')
     
     plt.tight_layout()
-    plt.savefig(output_dir / 'bucket_distribution.png', dpi=300)
+    plt.savefig(output_dir / 'bucket_distribution.png', **SAVEFIG_KWARGS)
     plt.close()
 
-def create_lorenz_curve(df, output_dir):
+def create_lorenz_curve(amounts_sorted, cum, total, output_dir):
     """Create Lorenz curve to show inequality."""
     plt.figure(figsize=(8, 8))
     
-    # Calculate Lorenz curve data
-    sorted_df = df.sort_values('amount')
-    total_tokens = sorted_df['amount'].sum()
-    total_holders = len(sorted_df)
+    # Calculate Lorenz curve data from the shared prefix sums
+    total_holders = amounts_sorted.size
     
-    cumulative_holders_pct = np.arange(1, total_holders + 1) / total_holders * 100
-    cumulative_tokens_pct = sorted_df['amount'].cumsum() / total_tokens * 100
+    cumulative_holders_pct = np.arange(1, total_holders + 1) * (100.0 / total_holders)
+    cumulative_tokens_pct = cum * (100.0 / total)
     
     # Plot Lorenz curve
     plt.plot(cumulative_holders_pct, cumulative_tokens_pct, 'b-', linewidth=2, label='Actual Distribution')
@@ -135,16 +237,14 @@ def create_lorenz_curve(df, output_dir):
     plt.grid(True, alpha=0.3)
     plt.legend()
     
-    # Calculate Gini coefficient
-    area_under_lorenz = np.trapz(cumulative_tokens_pct, cumulative_holders_pct)
-    area_under_equality = 5000  # Area of triangle
-    gini = (area_under_equality - area_under_lorenz) / area_under_equality
+    # Calculate Gini coefficient from the sorted prefix sums
+    gini = gini_from_sorted(amounts_sorted)
     
     plt.text(0.05, 0.95, f'Gini Coefficient: {gini:.3f}', 
              transform=plt.gca().transAxes, bbox=dict(boxstyle='round', facecolor='wheat'))
     
     plt.tight_layout()
-    plt.savefig(output_dir / 'lorenz_curve.png', dpi=300)
+    plt.savefig(output_dir / 'lorenz_curve.png', **SAVEFIG_KWARGS)
     plt.close()
     
     return gini
@@ -200,7 +300,8 @@ Top 10 Token Holders:
 
 def main():
     parser = argparse.ArgumentParser(description='Analyze token distribution')
-    parser.add_argument('analytics_file', help='Path to analytics JSON file')
+    parser.add_argument('analytics_file', nargs='?',
+                        help='Path to analytics JSON file (computed from the CSV if omitted)')
     parser.add_argument('csv_file', help='Path to distribution CSV file')
     parser.add_argument('--output-dir', default='./analytics_output', help='Directory for output files')
     
@@ -216,24 +317,37 @@ def main():
     print(f"Loaded data for {len(df)} addresses")
     print(f"Generating visualizations in {output_dir}...")
     
-    # Generate charts
-    create_distribution_histogram(df, output_dir)
-    print("✓ Created distribution histogram")
-    
-    create_cumulative_distribution(df, output_dir)
-    print("✓ Created cumulative distribution charts")
-    
-    create_bucket_chart(analytics, output_dir)
-    print("✓ Created bucket distribution charts")
-    
-    gini = create_lorenz_curve(df, output_dir)
-    print("✓ Created Lorenz curve")
+    # Sort once and share the prefix sums across all charts
+    amounts_sorted = np.sort(df['amount'].to_numpy())
+    cum = np.cumsum(amounts_sorted, dtype=np.float64)
+    total = cum[-1]
+    
+    if analytics is None:
+        analytics = compute_analytics(df, amounts_sorted, cum)
+    
+    # Generate charts; each one is independent and mostly PNG encoding, so
+    # render them in parallel worker processes
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        histogram = executor.submit(create_distribution_histogram, amounts_sorted, output_dir)
+        cumulative = executor.submit(create_cumulative_distribution, amounts_sorted, cum, output_dir)
+        bucket = executor.submit(create_bucket_chart, analytics, output_dir)
+        lorenz = executor.submit(create_lorenz_curve, amounts_sorted, cum, total, output_dir)
+        
+        histogram.result()
+        print("✓ Created distribution histogram")
+        
+        cumulative.result()
+        print("✓ Created cumulative distribution charts")
+        
+        bucket.result()
+        print("✓ Created bucket distribution charts")
+        
+        gini = lorenz.result()
+        print("✓ Created Lorenz curve")
     
     # Generate summary report
     generate_summary_report(analytics, df, output_dir, gini)
     print(f"\n✓ All visualizations saved to {output_dir}")
 
 if __name__ == '__main__':
-    # Add numpy import that was missing
-    import numpy as np
     main()
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""
+Shared helpers for the Blast API scraper scripts.
+"""
+
+import aiohttp
+import asyncio
+import orjson
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+
+# Candidate field names for the owner address and token ID in API responses
+OWNER_KEYS = ("ownerAddress", "owner_address", "owner")
+TOKEN_ID_KEYS = ("tokenId", "token_id", "id")
+
+
+def find_key(nft: Dict, candidates: Tuple[str, ...]) -> Optional[str]:
+    """Return the first candidate field name present in the NFT, if any."""
+    for key in candidates:
+        if key in nft:
+            return key
+    return None
+
+
+def split_token_range(
+    start_token_id: Optional[str], end_token_id: Optional[str], shards: int
+) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Split a token ID range into contiguous shards that can be paginated independently.
+
+    Shards share their boundary token IDs so that nothing is missed whether the
+    API treats endTokenId as inclusive or exclusive; duplicates are merged later.
+    Without both bounds the range cannot be split and a single shard is returned.
+
+    Args:
+        start_token_id: Optional starting token ID (decimal or 0x-prefixed hex)
+        end_token_id: Optional ending token ID (decimal or 0x-prefixed hex)
+        shards: Desired number of shards
+
+    Returns:
+        List of (start_token_id, end_token_id) pairs in the input format
+    """
+    if shards <= 1 or not start_token_id or not end_token_id:
+        return [(start_token_id, end_token_id)]
+
+    is_hex = start_token_id.startswith("0x")
+    start = int(start_token_id, 16) if is_hex else int(start_token_id)
+    end = int(end_token_id, 16) if end_token_id.startswith("0x") else int(end_token_id)
+    if end <= start:
+        return [(start_token_id, end_token_id)]
+
+    shards = min(shards, end - start)
+    bounds = [start + (end - start) * i // shards for i in range(shards + 1)]
+    fmt = hex if is_hex else str
+    return [(fmt(bounds[i]), fmt(bounds[i + 1])) for i in range(shards)]
+
+
+class ScrapeError(Exception):
+    """Raised when the API returns an error or a shard cannot be fetched completely."""
+
+
+class RateLimiter:
+    """
+    Spaces requests at least delay_ms apart across every task that shares it.
+    """
+
+    def __init__(self, delay_ms: int):
+        self.delay = delay_ms / 1000.0
+        self._lock = asyncio.Lock()
+        self._last_request = None
+
+    async def wait(self):
+        """Wait until the next request may be sent and claim that slot."""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            if self._last_request is not None and self.delay > 0:
+                remaining = self._last_request + self.delay - loop.time()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+            self._last_request = loop.time()
+
+
+async def fetch_pages(
+    session: aiohttp.ClientSession,
+    limiter: RateLimiter,
+    contract_address: str,
+    api_url: str,
+    start_token_id: Optional[str],
+    end_token_id: Optional[str],
+    page_size: int,
+) -> AsyncIterator[List[Dict]]:
+    """
+    Paginate through one token ID range, yielding the NFTs of each page.
+
+    Request and API errors are raised rather than ending the pagination early,
+    so a caller can tell an incomplete range from a finished one.
+
+    Args:
+        session: Shared aiohttp session
+        limiter: Rate limiter shared by all shards
+        contract_address: The NFT collection contract address
+        api_url: The Blast API URL
+        start_token_id: Optional starting token ID
+        end_token_id: Optional ending token ID
+        page_size: Number of items per page (max 100)
+
+    Raises:
+        aiohttp.ClientError: If a request fails
+        ScrapeError: If the API returns an error
+    """
+    page_key = None
+
+    while True:
+        # Build query parameters
+        params = {
+            "contractAddress": contract_address,
+            "pageSize": str(page_size),
+        }
+
+        # Add optional parameters
+        if start_token_id:
+            params["startTokenId"] = start_token_id
+        if end_token_id:
+            params["endTokenId"] = end_token_id
+        if page_key:
+            params["pageKey"] = page_key
+
+        # Make GET request with query parameters
+        await limiter.wait()
+        async with session.get(
+            api_url, params=params, headers={"Content-Type": "application/json"}
+        ) as response:
+            response.raise_for_status()
+            result = orjson.loads(await response.read())
+
+        if "error" in result:
+            raise ScrapeError(f"API Error: {result['error']}")
+
+        # The response structure might be different for GET request
+        # Try to handle both wrapped and unwrapped responses
+        if "result" in result:
+            data = result.get("result", {})
+        else:
+            data = result
+
+        nfts = data.get("nfts", [])
+        yield nfts
+
+        # Check if there are more pages
+        next_page_key = data.get("nextPageKey")
+        if not next_page_key or len(nfts) == 0:
+            return
+
+        page_key = next_page_key
+
+
+def scrape_shards(
+    contract_address: str,
+    api_url: str,
+    shards: List[Tuple[Optional[str], Optional[str]]],
+    page_size: int,
+    delay_ms: int,
+    on_page: Callable[[List[Dict]], str],
+):
+    """
+    Paginate all token ID shards concurrently under one shared rate limit.
+
+    Args:
+        contract_address: The NFT collection contract address
+        api_url: The Blast API URL
+        shards: (start_token_id, end_token_id) pairs from split_token_range
+        page_size: Number of items per page (max 100)
+        delay_ms: Minimum delay between any two requests in milliseconds
+        on_page: Called with each page's NFTs; returns a progress message
+
+    Raises:
+        ScrapeError: If any shard failed, so no partial result is saved
+    """
+
+    async def scrape_shard(session, limiter, shard_index, shard_start, shard_end):
+        prefix = f"[Shard {shard_index + 1}/{len(shards)}] " if len(shards) > 1 else ""
+        page_count = 0
+        try:
+            async for nfts in fetch_pages(
+                session,
+                limiter,
+                contract_address,
+                api_url,
+                shard_start,
+                shard_end,
+                page_size,
+            ):
+                page_count += 1
+                print(f"{prefix}Page {page_count}: {on_page(nfts)}")
+        except aiohttp.ClientError as e:
+            print(f"{prefix}Request error: {e}")
+            return False
+        except ScrapeError as e:
+            print(f"{prefix}{e}")
+            return False
+        except Exception as e:
+            print(f"{prefix}Unexpected error: {e}")
+            return False
+        return True
+
+    async def scrape_all():
+        limiter = RateLimiter(delay_ms)
+        async with aiohttp.ClientSession() as session:
+            return await asyncio.gather(
+                *(
+                    scrape_shard(session, limiter, i, shard_start, shard_end)
+                    for i, (shard_start, shard_end) in enumerate(shards)
+                )
+            )
+
+    results = asyncio.run(scrape_all())
+    failed = results.count(False)
+    if failed:
+        raise ScrapeError(
+            f"{failed} of {len(shards)} token ID range(s) failed; refusing to save a partial result"
+        )
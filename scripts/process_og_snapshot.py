@@ -1,44 +1,50 @@
 #!/usr/bin/env python3
 import csv
-import json
+import orjson
 
 def process_og_snapshot():
     # Read the CSV file
-    all_addresses = []
+    row_count = 0
     sepolia_addresses = []
     mainnet_addresses = []
     ethereum_mainnet_addresses = []
     empty_addresses = []
+    # Networks whose wallet addresses are collected, keyed for single-lookup dispatch
+    address_buckets = {
+        'sepolia': sepolia_addresses,
+        'mainnet': mainnet_addresses,
+    }
     
-    with open('scripts/OG_snapshot.csv', 'r') as csvfile:
-        reader = csv.DictReader(csvfile)
+    with open('scripts/OG_snapshot.csv', 'r', newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        # Resolve column positions once instead of building a dict per row
+        header = next(reader)
+        i_addr = header.index('starknetWalletAddress')
+        i_net = header.index('starknetNetwork')
+        i_id = header.index('discordMemberId')
+        
         for row in reader:
-            wallet_address = row['starknetWalletAddress'].strip()
-            network = row['starknetNetwork']
-            
-            # Track all addresses
-            all_addresses.append((network, wallet_address))
+            # Skip blank lines, which csv.DictReader ignored as well
+            if not row:
+                continue
+            row_count += 1
+            wallet_address = row[i_addr].strip()
+            network = row[i_net]
             
             # Categorize by network
             if not wallet_address:
-                empty_addresses.append(row['discordMemberId'])
-            elif network == 'sepolia' and wallet_address:
-                sepolia_addresses.append(wallet_address)
-            elif network == 'mainnet' and wallet_address:
-                mainnet_addresses.append(wallet_address)
+                empty_addresses.append(row[i_id])
+                continue
+            
+            target = address_buckets.get(network)
+            if target is not None:
+                target.append(wallet_address)
             elif network == 'ethereum-mainnet':
-                ethereum_mainnet_addresses.append(row['discordMemberId'])
+                ethereum_mainnet_addresses.append(row[i_id])
     
     # Remove duplicates from sepolia addresses while preserving order
-    unique_sepolia_addresses = []
-    seen = set()
-    duplicate_count = 0
-    for addr in sepolia_addresses:
-        if addr not in seen:
-            seen.add(addr)
-            unique_sepolia_addresses.append(addr)
-        else:
-            duplicate_count += 1
+    unique_sepolia_addresses = list(dict.fromkeys(sepolia_addresses))
+    duplicate_count = len(sepolia_addresses) - len(unique_sepolia_addresses)
     
     # Create the snapshot structure matching bayc_snapshot_ethereum.json
     snapshot_data = {
@@ -65,12 +71,12 @@ def process_og_snapshot():
     
     # Save to JSON file
     output_path = 'snapshots/og_snapshot_sepolia_starknet.json'
-    with open(output_path, 'w') as jsonfile:
-        json.dump(snapshot_data, jsonfile, indent=2)
+    with open(output_path, 'wb') as jsonfile:
+        jsonfile.write(orjson.dumps(snapshot_data, option=orjson.OPT_INDENT_2))
     
     # Print detailed statistics
     print("\n=== OG Snapshot Processing Statistics ===")
-    print(f"Total rows in CSV: {len(all_addresses)}")
+    print(f"Total rows in CSV: {row_count}")
     print(f"\nBreakdown by network:")
     print(f"  - Sepolia addresses: {len(sepolia_addresses)}")
     print(f"  - Mainnet addresses: {len(mainnet_addresses)}")
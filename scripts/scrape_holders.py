@@ -4,13 +4,52 @@ Script to scrape NFT holder addresses from a Starknet collection using Blast API
 Outputs in the same format as the snapshot files used by process.ts
 """
 
-import requests
-import json
-import time
+import orjson
 import argparse
-from typing import Dict, List, Optional, Set, Tuple
+import re
+from typing import BinaryIO, Dict, List, Optional
 import sys
 from collections import defaultdict
+from operator import itemgetter
+
+from blast_api import (
+    OWNER_KEYS,
+    TOKEN_ID_KEYS,
+    ScrapeError,
+    find_key,
+    scrape_shards,
+    split_token_range,
+)
+
+
+# Matches the 0x prefix plus any leading zero padding of a Starknet address
+STARKNET_PADDING_RE = re.compile(r"^0x0*")
+
+
+def normalize_address(owner_address: str, is_starknet: bool) -> str:
+    """
+    Normalize a raw owner address to the snapshot format.
+
+    Args:
+        owner_address: Owner address as returned by the API
+        is_starknet: Whether to strip Starknet address padding
+
+    Returns:
+        Lowercase 0x-prefixed address
+    """
+    # Ensure consistent formatting
+    if not owner_address.startswith("0x"):
+        owner_address = "0x" + owner_address
+    owner_address = owner_address.lower()
+
+    # For Starknet, remove padding (leading zeros after 0x)
+    if is_starknet:
+        owner_address = STARKNET_PADDING_RE.sub("0x", owner_address, count=1)
+        # Handle edge case where address might be all zeros
+        if owner_address == "0x":
+            owner_address = "0x0"
+
+    return owner_address
 
 
 def get_collection_holders(
@@ -24,6 +63,7 @@ def get_collection_holders(
     page_size: int = 100,
     delay_ms: int = 200,
     block_height: Optional[int] = None,
+    concurrency: int = 4,
 ) -> Dict:
     """
     Fetch all NFT holders from a collection using pagination.
@@ -37,130 +77,74 @@ def get_collection_holders(
         start_token_id: Optional starting token ID
         end_token_id: Optional ending token ID
         page_size: Number of items per page (max 100)
-        delay_ms: Delay between requests in milliseconds
+        delay_ms: Minimum delay between any two requests in milliseconds
         block_height: Block height for snapshot
+        concurrency: Number of token ID shards fetched concurrently
 
     Returns:
         Dict containing the snapshot data
+
+    Raises:
+        ScrapeError: If any part of the token range could not be fetched
     """
-    # Track holders and their token IDs
-    holders_tokens: Dict[str, Set[str]] = defaultdict(set)
-    page_key = None
-    page_count = 0
+    # Track token IDs (as ints) per raw owner address; addresses are
+    # normalized once per unique holder after the scrape
+    raw_holders_tokens: Dict[str, List[int]] = defaultdict(list)
+    # Bound once the response field names are known
+    get_fields = None
 
     print(f"Fetching NFT holders from collection: {contract_address}")
     print(f"API URL: {api_url}")
 
-    while True:
-        # Build query parameters
-        params = {
-            "contractAddress": contract_address,
-            "pageSize": str(page_size),
-        }
-
-        # Add optional parameters
-        if start_token_id:
-            params["startTokenId"] = start_token_id
-        if end_token_id:
-            params["endTokenId"] = end_token_id
-        if page_key:
-            params["pageKey"] = page_key
-
-        # Make GET request with query parameters
-        try:
-            response = requests.get(
-                api_url, params=params, headers={"Content-Type": "application/json"}
-            )
-            response.raise_for_status()
-
-            result = response.json()
-
-            if "error" in result:
-                print(f"API Error: {result['error']}")
-                break
-
-            # The response structure might be different for GET request
-            # Try to handle both wrapped and unwrapped responses
-            if "result" in result:
-                data = result.get("result", {})
-            else:
-                data = result
-                
-            nfts = data.get("nfts", [])
-
-            # Extract holder addresses and token IDs from NFTs
-            for nft in nfts:
-                # Get owner address - try different possible field names
-                owner_address = None
-                if "ownerAddress" in nft:
-                    owner_address = nft["ownerAddress"]
-                elif "owner_address" in nft:
-                    owner_address = nft["owner_address"]
-                elif "owner" in nft:
-                    owner_address = nft["owner"]
-                
-                # Get token ID - try different possible field names
-                token_id = None
-                if "tokenId" in nft:
-                    token_id = nft["tokenId"]
-                elif "token_id" in nft:
-                    token_id = nft["token_id"]
-                elif "id" in nft:
-                    token_id = nft["id"]
-                
-                if owner_address and token_id:
-                    # Ensure consistent formatting
-                    if not owner_address.startswith("0x"):
-                        owner_address = "0x" + owner_address
-                    owner_address = owner_address.lower()
-                    
-                    # For Starknet, remove padding (leading zeros after 0x)
-                    if network.lower() == "starknet":
-                        # Remove 0x prefix, strip leading zeros, then add 0x back
-                        owner_address = "0x" + owner_address[2:].lstrip("0")
-                        # Handle edge case where address might be all zeros
-                        if owner_address == "0x":
-                            owner_address = "0x0"
-                    
-                    # Store token ID as hex string
-                    if isinstance(token_id, int):
-                        token_id_hex = hex(token_id)
-                    elif isinstance(token_id, str) and not token_id.startswith("0x"):
-                        token_id_hex = hex(int(token_id))
-                    else:
-                        token_id_hex = token_id
-                    
-                    holders_tokens[owner_address].add(token_id_hex)
+    shards = split_token_range(start_token_id, end_token_id, concurrency)
+    if len(shards) > 1:
+        print(f"Splitting token range into {len(shards)} shards")
+
+    def process_nfts(nfts: List[Dict]) -> str:
+        nonlocal get_fields
 
-            page_count += 1
-            print(
-                f"Page {page_count}: Processed {len(nfts)} NFTs (Total unique holders: {len(holders_tokens)})"
-            )
+        # Extract holder addresses and token IDs from NFTs
+        for nft in nfts:
+            # Resolve the owner/token ID field names from the first NFT
+            # that has both, then use a direct accessor for the rest
+            if get_fields is None:
+                owner_key = find_key(nft, OWNER_KEYS)
+                id_key = find_key(nft, TOKEN_ID_KEYS)
+                if owner_key is None or id_key is None:
+                    continue
+                get_fields = itemgetter(owner_key, id_key)
 
-            # Check if there are more pages
-            next_page_key = data.get("nextPageKey")
-            if not next_page_key or len(nfts) == 0:
-                break
+            try:
+                owner_address, token_id = get_fields(nft)
+            except KeyError:
+                continue
 
-            page_key = next_page_key
+            if owner_address and token_id:
+                # Buffer token IDs as ints; hex formatting happens on output
+                if isinstance(token_id, str):
+                    if token_id.startswith("0x"):
+                        token_id = int(token_id, 16)
+                    else:
+                        token_id = int(token_id)
+
+                raw_holders_tokens[owner_address].append(token_id)
 
-            # Rate limiting delay
-            if delay_ms > 0:
-                time.sleep(delay_ms / 1000.0)
+        return f"Processed {len(nfts)} NFTs (Total unique holders: {len(raw_holders_tokens)})"
 
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            break
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            break
+    scrape_shards(contract_address, api_url, shards, page_size, delay_ms, process_nfts)
+
+    # Merge raw addresses that normalize to the same holder
+    is_starknet = network.lower() == "starknet"
+    holders_tokens: Dict[str, List[int]] = defaultdict(list)
+    for raw_address, token_ids in raw_holders_tokens.items():
+        holders_tokens[normalize_address(raw_address, is_starknet)].extend(token_ids)
 
     # Convert to snapshot format
     snapshot_data = []
     for address, token_ids in sorted(holders_tokens.items()):
-        # Sort token IDs for consistent output
-        sorted_token_ids = sorted(list(token_ids), key=lambda x: int(x, 16))
-        snapshot_data.append([address, sorted_token_ids])
+        # Deduplicate (shards share boundary token IDs), sort for consistent
+        # output and store token IDs as hex strings
+        snapshot_data.append([address, [hex(token_id) for token_id in sorted(set(token_ids))]])
     
     # Determine chain_id based on network
     chain_id_map = {
@@ -186,6 +170,31 @@ def get_collection_holders(
     return snapshot
 
 
+def write_snapshot_json(snapshot: Dict, f: BinaryIO):
+    """
+    Stream a snapshot to a binary file as JSON, one holder entry at a time.
+
+    Only a single entry is encoded at once, so the encoded output never has to
+    be held in memory alongside the snapshot itself.
+
+    Args:
+        snapshot: The snapshot data; "snapshot" may be any iterable of entries
+        f: Binary file handle to write to
+    """
+    f.write(b"{\n")
+    for key, value in snapshot.items():
+        if key != "snapshot":
+            f.write(b"  " + orjson.dumps(key) + b": " + orjson.dumps(value) + b",\n")
+
+    f.write(b'  "snapshot": [')
+    separator = b"\n    "
+    for entry in snapshot["snapshot"]:
+        f.write(separator)
+        f.write(orjson.dumps(entry))
+        separator = b",\n    "
+    f.write(b"]\n}\n" if separator == b"\n    " else b"\n  ]\n}\n")
+
+
 def save_snapshot(snapshot: Dict, output_file: str):
     """
     Save snapshot to a file in JSON format.
@@ -196,8 +205,8 @@ def save_snapshot(snapshot: Dict, output_file: str):
     """
     print(f"\nSaving snapshot to {output_file}")
     
-    with open(output_file, "w") as f:
-        json.dump(snapshot, f, indent=2)
+    with open(output_file, "wb") as f:
+        write_snapshot_json(snapshot, f)
     
     print(f"Snapshot saved successfully!")
     print(f"Total unique holders: {len(snapshot['snapshot'])}")
@@ -248,13 +257,20 @@ def main():
         "--delay-ms",
         type=int,
         default=200,
-        help="Delay between requests in milliseconds (default: 200)",
+        help="Minimum delay between requests in milliseconds, shared across all shards (default: 200)",
     )
     parser.add_argument(
         "--block-height",
         type=int,
         help="Block height for the snapshot",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Number of token ID shards to fetch concurrently when both "
+        "--start-token-id and --end-token-id are given (default: 4)",
+    )
 
     args = parser.parse_args()
 
@@ -273,18 +289,23 @@ def main():
         args.page_size = 100
 
     # Scrape holders
-    snapshot = get_collection_holders(
-        contract_address=args.contract_address,
-        api_url=args.api_url,
-        network=args.network,
-        collection_name=args.name,
-        description=args.description,
-        start_token_id=args.start_token_id,
-        end_token_id=args.end_token_id,
-        page_size=args.page_size,
-        delay_ms=args.delay_ms,
-        block_height=args.block_height,
-    )
+    try:
+        snapshot = get_collection_holders(
+            contract_address=args.contract_address,
+            api_url=args.api_url,
+            network=args.network,
+            collection_name=args.name,
+            description=args.description,
+            start_token_id=args.start_token_id,
+            end_token_id=args.end_token_id,
+            page_size=args.page_size,
+            delay_ms=args.delay_ms,
+            block_height=args.block_height,
+            concurrency=args.concurrency,
+        )
+    except ScrapeError as e:
+        print(f"\n{e}")
+        sys.exit(1)
 
     if snapshot["snapshot"]:
         # Save to file
@@ -4,13 +4,15 @@ Script to scrape NFT token IDs from a Starknet collection using Blast API.
 Saves the token IDs to a file for use with the merkle-drops snapshot command.
 """
 
-import requests
 import json
+import orjson
 import time
 import argparse
-from typing import List, Optional
+from typing import Dict, List, Optional
 import sys
 
+from blast_api import TOKEN_ID_KEYS, ScrapeError, find_key, scrape_shards, split_token_range
+
 
 def get_collection_nfts(
     contract_address: str,
@@ -19,6 +21,7 @@ def get_collection_nfts(
     end_token_id: Optional[str] = None,
     page_size: int = 100,
     delay_ms: int = 200,
+    concurrency: int = 4,
 ) -> List[int]:
     """
     Fetch all NFT token IDs from a collection using pagination.
@@ -29,100 +32,53 @@ def get_collection_nfts(
         start_token_id: Optional starting token ID
         end_token_id: Optional ending token ID
         page_size: Number of items per page (max 100)
-        delay_ms: Delay between requests in milliseconds
+        delay_ms: Minimum delay between any two requests in milliseconds
+        concurrency: Number of token ID shards fetched concurrently
 
     Returns:
         List of token IDs
+
+    Raises:
+        ScrapeError: If any part of the token range could not be fetched
     """
     token_ids = []
-    page_key = None
-    page_count = 0
+    # Bound once the response field name is known
+    id_key = None
 
     print(f"Fetching NFTs from collection: {contract_address}")
     print(f"API URL: {api_url}")
 
-    while True:
-        # Build query parameters
-        params = {
-            "contractAddress": contract_address,
-            "pageSize": str(page_size),
-        }
-
-        # Add optional parameters
-        if start_token_id:
-            params["startTokenId"] = start_token_id
-        if end_token_id:
-            params["endTokenId"] = end_token_id
-        if page_key:
-            params["pageKey"] = page_key
-
-        # Make GET request with query parameters
-        try:
-            response = requests.get(
-                api_url, params=params, headers={"Content-Type": "application/json"}
-            )
-            response.raise_for_status()
-
-            result = response.json()
-
-            if "error" in result:
-                print(f"API Error: {result['error']}")
-                break
-
-            # The response structure might be different for GET request
-            # Try to handle both wrapped and unwrapped responses
-            if "result" in result:
-                data = result.get("result", {})
-            else:
-                data = result
-                
-            nfts = data.get("nfts", [])
-
-            # Extract token IDs from NFTs
-            for nft in nfts:
-                # Token ID might be in different fields depending on the API response
-                token_id = None
-
-                # Try different possible field names
-                if "tokenId" in nft:
-                    token_id = nft["tokenId"]
-                elif "token_id" in nft:
-                    token_id = nft["token_id"]
-                elif "id" in nft:
-                    token_id = nft["id"]
-
-                if token_id is not None:
-                    # Convert hex string to int if necessary
-                    if isinstance(token_id, str):
-                        if token_id.startswith("0x"):
-                            token_ids.append(int(token_id, 16))
-                        else:
-                            token_ids.append(int(token_id))
+    shards = split_token_range(start_token_id, end_token_id, concurrency)
+    if len(shards) > 1:
+        print(f"Splitting token range into {len(shards)} shards")
+
+    def process_nfts(nfts: List[Dict]) -> str:
+        nonlocal id_key
+
+        # Extract token IDs from NFTs
+        for nft in nfts:
+            # Token ID might be in different fields depending on the API
+            # response; resolve the field name once and reuse it
+            if id_key is None:
+                id_key = find_key(nft, TOKEN_ID_KEYS)
+                if id_key is None:
+                    continue
+
+            token_id = nft.get(id_key)
+
+            if token_id is not None:
+                # Convert hex string to int if necessary
+                if isinstance(token_id, str):
+                    if token_id.startswith("0x"):
+                        token_ids.append(int(token_id, 16))
                     else:
                         token_ids.append(int(token_id))
+                else:
+                    token_ids.append(int(token_id))
 
-            page_count += 1
-            print(
-                f"Page {page_count}: Retrieved {len(nfts)} NFTs (Total: {len(token_ids)})"
-            )
-
-            # Check if there are more pages
-            next_page_key = data.get("nextPageKey")
-            if not next_page_key or len(nfts) == 0:
-                break
+        return f"Retrieved {len(nfts)} NFTs (Total: {len(token_ids)})"
 
-            page_key = next_page_key
-
-            # Rate limiting delay
-            if delay_ms > 0:
-                time.sleep(delay_ms / 1000.0)
-
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            break
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            break
+    scrape_shards(contract_address, api_url, shards, page_size, delay_ms, process_nfts)
 
     return token_ids
 
@@ -137,32 +93,43 @@ def save_token_ids(token_ids: List[int], output_file: str, format: str = "txt"):
         format: Output format ('txt', 'json', or 'csv')
     """
     # Sort and remove duplicates
-    unique_ids = sorted(list(set(token_ids)))
+    unique_ids = sorted(set(token_ids))
 
     print(f"\nSaving {len(unique_ids)} unique token IDs to {output_file}")
 
     if format == "json":
-        with open(output_file, "w") as f:
-            json.dump(unique_ids, f, indent=2)
+        # orjson only encodes integers up to 64 bits, wider IDs use the stdlib encoder
+        if not unique_ids or unique_ids[-1] < 2**64:
+            with open(output_file, "wb") as f:
+                f.write(orjson.dumps(unique_ids, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, "w") as f:
+                json.dump(unique_ids, f, indent=2)
     elif format == "csv":
         # Write as comma-separated values, 100 per line for readability
         with open(output_file, "w") as f:
-            for i in range(0, len(unique_ids), 100):
-                batch = unique_ids[i : i + 100]
-                f.write(",".join(map(str, batch)) + "\n")
+            if unique_ids:
+                f.write(
+                    "\n".join(
+                        ",".join(map(str, unique_ids[i : i + 100]))
+                        for i in range(0, len(unique_ids), 100)
+                    )
+                )
+                f.write("\n")
     else:  # txt format (default)
         with open(output_file, "w") as f:
             f.write("# Token IDs for NFT collection\n")
             f.write(f"# Total: {len(unique_ids)} tokens\n")
             f.write(f"# Generated on: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            for token_id in unique_ids:
-                f.write(f"{token_id}\n")
+            if unique_ids:
+                f.write("\n".join(map(str, unique_ids)))
+                f.write("\n")
 
     print(f"Token IDs saved successfully!")
     print(f"Format: {format}")
     print(f"Total unique IDs: {len(unique_ids)}")
     if unique_ids:
-        print(f"Range: {min(unique_ids)} to {max(unique_ids)}")
+        print(f"Range: {unique_ids[0]} to {unique_ids[-1]}")
 
 
 def main():
@@ -200,7 +167,14 @@ def main():
         "--delay-ms",
         type=int,
         default=200,
-        help="Delay between requests in milliseconds (default: 200)",
+        help="Minimum delay between requests in milliseconds, shared across all shards (default: 200)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Number of token ID shards to fetch concurrently when both "
+        "--start-token-id and --end-token-id are given (default: 4)",
     )
 
     args = parser.parse_args()
@@ -211,14 +185,19 @@ def main():
         args.page_size = 100
 
     # Scrape token IDs
-    token_ids = get_collection_nfts(
-        contract_address=args.contract_address,
-        api_url=args.api_url,
-        start_token_id=args.start_token_id,
-        end_token_id=args.end_token_id,
-        page_size=args.page_size,
-        delay_ms=args.delay_ms,
-    )
+    try:
+        token_ids = get_collection_nfts(
+            contract_address=args.contract_address,
+            api_url=args.api_url,
+            start_token_id=args.start_token_id,
+            end_token_id=args.end_token_id,
+            page_size=args.page_size,
+            delay_ms=args.delay_ms,
+            concurrency=args.concurrency,
+        )
+    except ScrapeError as e:
+        print(f"\n{e}")
+        sys.exit(1)
 
     if token_ids:
         # Save to file